@@ -3,12 +3,26 @@
 import os
 from typing import Dict
 
+import httpx
+
 # Load required environment variables
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
 GITHUB_OWNER = os.getenv("GITHUB_OWNER", "ESP-2025")
 GITHUB_REPO = os.getenv("GITHUB_REPO", "github_service")
 WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET")
+# Encoded once for the HMAC key; an unset secret is rejected by _validate_config at startup
+WEBHOOK_SECRET_BYTES = (WEBHOOK_SECRET or "").encode('utf-8')
 PORT = int(os.getenv("PORT", "8000"))
+# Largest webhook delivery accepted, in bytes (default 1 MiB)
+MAX_WEBHOOK_BODY_BYTES = int(os.getenv("MAX_WEBHOOK_BODY_BYTES", str(1024 * 1024)))
+
+# Outbound GitHub API timeouts: a client-wide default (used by reads) plus overrides for the write endpoints
+DEFAULT_HTTP_TIMEOUT = httpx.Timeout(connect=3.0, read=10.0, write=5.0, pool=2.0)
+HTTP_TIMEOUTS: Dict[str, httpx.Timeout] = {
+    "create_issue": httpx.Timeout(connect=3.0, read=15.0, write=10.0, pool=2.0),
+    "update_issue": httpx.Timeout(connect=3.0, read=15.0, write=10.0, pool=2.0),
+    "create_comment": httpx.Timeout(connect=3.0, read=15.0, write=10.0, pool=2.0),
+}
 
 # Validate required vars when accessed (not at import time for testing)
 def _validate_config():
@@ -18,11 +32,14 @@ def _validate_config():
     if not WEBHOOK_SECRET:
         raise ValueError("WEBHOOK_SECRET environment variable is required")
 
-def gh_headers() -> Dict[str, str]:
-    """Return standard GitHub API headers with Bearer token and Accept header."""
+# Standard GitHub API headers, built once by init_config() at startup
+GH_HEADERS: Dict[str, str] = {}
+
+def init_config():
+    """Validate configuration and build the GitHub API headers (Bearer token and Accept header)."""
     _validate_config()
-    return {
+    GH_HEADERS.update({
         "Authorization": f"Bearer {GITHUB_TOKEN}",
         "Accept": "application/vnd.github+json",
         "X-GitHub-Api-Version": "2022-11-28"
-    }
\ No newline at end of file
+    })
\ No newline at end of file
@@ -1,16 +1,50 @@
 ''' Authored by Akshata Madavi '''
 
+from contextlib import asynccontextmanager
+
+import httpx
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from src import config
+from src.middleware import BodySizeLimitMiddleware, FastHealthMiddleware, SubAppDispatchMiddleware
+from src.responses import ORJSONResponse
 from src.routes import issues, webhooks
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Validate configuration, then open one pooled GitHub API client for the process and close it on shutdown."""
+    config.init_config()
+    client = httpx.AsyncClient(
+        base_url="https://api.github.com",
+        headers=config.GH_HEADERS,
+        http2=True,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=100),
+        timeout=config.DEFAULT_HTTP_TIMEOUT,
+    )
+    app.state.gh_client = client
+    try:
+        yield
+    finally:
+        await client.aclose()
+
 app = FastAPI(
     title="GitHub Service API",
     description="FastAPI wrapper for GitHub REST API for issues",
     version="0.1.0",
-    openapi_version="3.1.0"
+    openapi_version="3.1.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
+)
+
+# Webhooks are server-to-server calls from GitHub and need no CORS, so they are
+# served by a separate app with an empty middleware stack
+webhook_app = FastAPI(
+    openapi_url=None, docs_url=None, redoc_url=None, default_response_class=ORJSONResponse
 )
+webhook_app.include_router(webhooks.router)
+# Refuse oversized deliveries before any body is read or hashed
+webhook_app.add_middleware(BodySizeLimitMiddleware, max_body_size=lambda: config.MAX_WEBHOOK_BODY_BYTES)
 
 # Add CORS middleware
 app.add_middleware(
@@ -21,6 +55,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Send GitHub deliveries straight to webhook_app, bypassing CORS; the browser-facing
+# /events debug endpoint stays on the main app behind CORS
+app.add_middleware(SubAppDispatchMiddleware, target=webhook_app, paths=["/webhook"])
+
+# Answer health probes ahead of CORS and routing (added last, so it runs first)
+app.add_middleware(FastHealthMiddleware)
+
 @app.get("/health")
 def health_check():
     """Return application health status."""
@@ -38,4 +79,11 @@ def read_root():
 
 # Include routers
 app.include_router(issues.router, prefix="/issues", tags=["issues"])
-app.include_router(webhooks.router, tags=["webhooks"])
\ No newline at end of file
+# Webhook routes are also kept on the main app: /events is served from here, and
+# /webhook appears in the OpenAPI schema while its requests go to webhook_app above
+app.include_router(webhooks.router, tags=["webhooks"])
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run("src.main:app", host="0.0.0.0", port=config.PORT, loop="uvloop", http="httptools")
\ No newline at end of file
@@ -0,0 +1,10 @@
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson instead of the stdlib json encoder."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content)
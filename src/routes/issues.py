@@ -1,17 +1,27 @@
 import httpx
+import orjson
 import time
-import hashlib
-from typing import Optional, Dict
+from typing import Optional, Dict, Tuple
 from fastapi import APIRouter, Query, HTTPException, Response, status, Request
-from fastapi.responses import JSONResponse
 
 from src import config
+from src.responses import ORJSONResponse
 from src.models import CreateIssueRequest, UpdateIssueRequest, CreateCommentRequest
 
 router = APIRouter()
 
 # In-memory cache for ETags
-etag_cache: Dict[str, str] = {}
+etag_cache: Dict[Tuple, str] = {}
+
+# Request bodies are serialized by pydantic and sent as pre-encoded JSON
+JSON_CONTENT_TYPE = {"Content-Type": "application/json"}
+
+def _not_modified(cache_key: Tuple, etag: Optional[str]) -> Response:
+    """Build a 304 that carries GitHub's ETag, caching it for the next conditional request."""
+    if not etag:
+        return Response(status_code=304)
+    etag_cache[cache_key] = etag
+    return Response(status_code=304, headers={"ETag": etag})
 
 ## Authored by Akshata Madavi
 @router.get("")
@@ -25,14 +35,14 @@ async def get_repo_issues(
 ):
     """Fetch issues from a GitHub repository with pagination and filtering, with ETag caching support."""
     # Build cache key from parameters
-    cache_key = _build_cache_key("issues", state, sort, direction, per_page, page)
+    cache_key = ("issues", state, sort, direction, per_page, page)
 
     # Check for If-None-Match header
     if_none_match = request.headers.get("If-None-Match")
-    if if_none_match and cache_key in etag_cache and etag_cache[cache_key] == if_none_match:
-        return Response(status_code=304)
+    if if_none_match and etag_cache.get(cache_key) == if_none_match:
+        return Response(status_code=304, headers={"ETag": if_none_match})
 
-    url = f"https://api.github.com/repos/{config.GITHUB_OWNER}/{config.GITHUB_REPO}/issues"
+    url = f"/repos/{config.GITHUB_OWNER}/{config.GITHUB_REPO}/issues"
     params = {
         "state": state,
         "sort": sort,
@@ -43,174 +53,178 @@ async def get_repo_issues(
     # Remove None values
     params = {k: v for k, v in params.items() if v is not None}
 
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(url, params=params, headers=config.gh_headers())
-            await _handle_github_response(response)
-            issues_data = response.json()
-            # Normalize each issue in the list
-            normalized_issues = [_normalize_issue_response(issue) for issue in issues_data]
-            # Collect headers to forward
-            headers_out = {}
-            etag = response.headers.get("ETag")
-            if etag:
-                etag_cache[cache_key] = etag
-                headers_out["ETag"] = etag
-
-            link = response.headers.get("Link")
-            if link:
-                headers_out["Link"] = link  # propagate GitHub pagination
-
-            # Optionally forward rate-limit headers too:
-            for h in ("X-RateLimit-Limit", "X-RateLimit-Remaining", "X-RateLimit-Reset"):
-                if h in response.headers:
-                    headers_out[h] = response.headers[h]
-
-            if headers_out:
-                return JSONResponse(content=normalized_issues, headers=headers_out)
-            else:
-                return normalized_issues
-
-        except httpx.HTTPStatusError as e:
-            await _handle_github_error(e)
+    # Forward the client's ETag so GitHub can answer 304 without resending the list
+    fwd_headers = {"If-None-Match": if_none_match} if if_none_match else None
+
+    client = request.app.state.gh_client
+    try:
+        response = await client.get(url, params=params, headers=fwd_headers)
+        if response.status_code == 304:
+            return _not_modified(cache_key, response.headers.get("ETag"))
+        await _handle_github_response(response)
+        issues_data = orjson.loads(response.content)
+        # Normalize each issue in the list
+        normalized_issues = [_normalize_issue_response(issue) for issue in issues_data]
+        # Collect headers to forward
+        headers_out = {}
+        etag = response.headers.get("ETag")
+        if etag:
+            etag_cache[cache_key] = etag
+            headers_out["ETag"] = etag
+
+        link = response.headers.get("Link")
+        if link:
+            headers_out["Link"] = link  # propagate GitHub pagination
+
+        # Optionally forward rate-limit headers too:
+        for h in ("X-RateLimit-Limit", "X-RateLimit-Remaining", "X-RateLimit-Reset"):
+            if h in response.headers:
+                headers_out[h] = response.headers[h]
+
+        if headers_out:
+            return ORJSONResponse(content=normalized_issues, headers=headers_out)
+        else:
+            return normalized_issues
+
+    except httpx.HTTPStatusError as e:
+        await _handle_github_error(e)
 ## Authored by Akshata Madavi
 @router.get("/{number}")
 async def get_issue(number: int, request: Request):
     """Fetch a specific issue by its number from the GitHub repository, with ETag caching support."""
     # Build cache key for specific issue
-    cache_key = f"issue_{number}"
+    cache_key = ("issue", number)
     
     # Check for If-None-Match header
     if_none_match = request.headers.get("If-None-Match")
-    if if_none_match and cache_key in etag_cache and etag_cache[cache_key] == if_none_match:
-        return Response(status_code=304)
+    if if_none_match and etag_cache.get(cache_key) == if_none_match:
+        return Response(status_code=304, headers={"ETag": if_none_match})
     
-    url = f"https://api.github.com/repos/{config.GITHUB_OWNER}/{config.GITHUB_REPO}/issues/{number}"
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(url, headers=config.gh_headers())
-            await _handle_github_response(response)
-            normalized_issue = _normalize_issue_response(response.json())
-            
-            # Store ETag in cache and return with ETag header
-            etag = response.headers.get("ETag")
-            if etag:
-                etag_cache[cache_key] = etag
-                return JSONResponse(
-                    content=normalized_issue,
-                    headers={"ETag": etag}
-                )
-            
-            return normalized_issue
-        except httpx.HTTPStatusError as e:
-            await _handle_github_error(e)
+    url = f"/repos/{config.GITHUB_OWNER}/{config.GITHUB_REPO}/issues/{number}"
+    # Forward the client's ETag so GitHub can answer 304 without resending the issue
+    fwd_headers = {"If-None-Match": if_none_match} if if_none_match else None
+
+    client = request.app.state.gh_client
+    try:
+        response = await client.get(url, headers=fwd_headers)
+        if response.status_code == 304:
+            return _not_modified(cache_key, response.headers.get("ETag"))
+        await _handle_github_response(response)
+        normalized_issue = _normalize_issue_response(orjson.loads(response.content))
+        
+        # Store ETag in cache and return with ETag header
+        etag = response.headers.get("ETag")
+        if etag:
+            etag_cache[cache_key] = etag
+            return ORJSONResponse(
+                content=normalized_issue,
+                headers={"ETag": etag}
+            )
+        
+        return normalized_issue
+    except httpx.HTTPStatusError as e:
+        await _handle_github_error(e)
 
 ## Authored by Joshini M Naagraj
 @router.post("", status_code=status.HTTP_201_CREATED)
-async def create_issue(issue_data: CreateIssueRequest, response: Response):
+async def create_issue(issue_data: CreateIssueRequest, request: Request, response: Response):
     """Create a new issue in the GitHub repository and return the created issue."""
-    url = f"https://api.github.com/repos/{config.GITHUB_OWNER}/{config.GITHUB_REPO}/issues"
+    url = f"/repos/{config.GITHUB_OWNER}/{config.GITHUB_REPO}/issues"
     
-    async with httpx.AsyncClient() as client:
-        try:
-            response_gh = await client.post(url, json=issue_data.dict(), headers=config.gh_headers())
-            await _handle_github_response(response_gh)
-            
-            issue_data_response = response_gh.json()
-            response.headers["Location"] = f"/issues/{issue_data_response['number']}"
-            
-            return _normalize_issue_response(issue_data_response)
-        except httpx.HTTPStatusError as e:
-            await _handle_github_error(e)
+    client = request.app.state.gh_client
+    try:
+        response_gh = await client.post(
+            url,
+            content=issue_data.model_dump_json().encode(),
+            headers=JSON_CONTENT_TYPE,
+            timeout=config.HTTP_TIMEOUTS["create_issue"],
+        )
+        await _handle_github_response(response_gh)
+        
+        issue_data_response = orjson.loads(response_gh.content)
+        response.headers["Location"] = f"/issues/{issue_data_response['number']}"
+        
+        return _normalize_issue_response(issue_data_response)
+    except httpx.HTTPStatusError as e:
+        await _handle_github_error(e)
 
 ## Authored by Joshini M Naagraj
 @router.patch("/{number}")
-async def update_issue(number: int, issue_data: UpdateIssueRequest):
+async def update_issue(number: int, issue_data: UpdateIssueRequest, request: Request):
     """Update an existing issue (title, body, or state) in the GitHub repository."""
     # Reject empty body
-    if not issue_data.dict(exclude_unset=True):
+    payload = issue_data.model_dump(exclude_unset=True)
+    if not payload:
         raise HTTPException(status_code=400, detail="Request body cannot be empty")
     
-    url = f"https://api.github.com/repos/{config.GITHUB_OWNER}/{config.GITHUB_REPO}/issues/{number}"
+    url = f"/repos/{config.GITHUB_OWNER}/{config.GITHUB_REPO}/issues/{number}"
     
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.patch(url, json=issue_data.dict(exclude_unset=True), headers=config.gh_headers())
-            await _handle_github_response(response)
-            return _normalize_issue_response(response.json())
-        except httpx.HTTPStatusError as e:
-            await _handle_github_error(e)
+    client = request.app.state.gh_client
+    try:
+        response = await client.patch(
+            url, json=payload, timeout=config.HTTP_TIMEOUTS["update_issue"]
+        )
+        await _handle_github_response(response)
+        return _normalize_issue_response(orjson.loads(response.content))
+    except httpx.HTTPStatusError as e:
+        await _handle_github_error(e)
 
 ## Authored by Sankalp Wahane
 @router.post("/{number}/comments", status_code=status.HTTP_201_CREATED)
-async def create_comment(number: int, comment_data: CreateCommentRequest):
+async def create_comment(number: int, comment_data: CreateCommentRequest, request: Request):
     """Add a comment to an existing issue."""
-    url = f"https://api.github.com/repos/{config.GITHUB_OWNER}/{config.GITHUB_REPO}/issues/{number}/comments"
+    url = f"/repos/{config.GITHUB_OWNER}/{config.GITHUB_REPO}/issues/{number}/comments"
     
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.post(url, json=comment_data.dict(), headers=config.gh_headers())
-            await _handle_github_response(response)
-            return response.json()
-        except httpx.HTTPStatusError as e:
-            await _handle_github_error(e)
+    client = request.app.state.gh_client
+    try:
+        response = await client.post(
+            url,
+            content=comment_data.model_dump_json().encode(),
+            headers=JSON_CONTENT_TYPE,
+            timeout=config.HTTP_TIMEOUTS["create_comment"],
+        )
+        await _handle_github_response(response)
+        return orjson.loads(response.content)
+    except httpx.HTTPStatusError as e:
+        await _handle_github_error(e)
 
 # Helper functions
+# GitHub error statuses mapped to the status code and detail returned to our clients
+_ERROR_MAP = {
+    401: (401, "Unauthorized - Invalid GitHub token"),
+    403: (403, "Forbidden"),
+    404: (404, "Not found"),
+}
+
 async def _handle_github_response(response: httpx.Response):
     """Handle GitHub API response and raise appropriate HTTP exceptions for errors."""
-    if response.status_code == 401:
-        raise HTTPException(status_code=401, detail="Unauthorized - Invalid GitHub token")
-    elif response.status_code == 403:
+    if response.is_success:
+        return
+
+    if response.status_code == 403:
         # Check for rate limiting
-        if "X-RateLimit-Remaining" in response.headers and response.headers["X-RateLimit-Remaining"] == "0":
-            retry_after = response.headers.get("X-RateLimit-Reset", str(int(time.time()) + 60))
+        if response.headers.get("X-RateLimit-Remaining") == "0":
+            retry_after = response.headers.get("X-RateLimit-Reset") or str(int(time.time()) + 60)
             raise HTTPException(
                 status_code=429, 
                 detail="Rate limit exceeded",
                 headers={"Retry-After": retry_after}
             )
-        raise HTTPException(status_code=403, detail="Forbidden")
-    elif response.status_code == 404:
-        raise HTTPException(status_code=404, detail="Not found")
-    elif response.status_code >= 500:
+
+    mapped = _ERROR_MAP.get(response.status_code)
+    if mapped:
+        raise HTTPException(status_code=mapped[0], detail=mapped[1])
+    if response.status_code >= 500:
         raise HTTPException(status_code=503, detail="Upstream failure")
-    elif not response.is_success:
-        raise HTTPException(status_code=400, detail="Bad request")
+    raise HTTPException(status_code=400, detail="Bad request")
 
 async def _handle_github_error(e: httpx.HTTPStatusError):
     """Handle GitHub API HTTP errors and map them to appropriate HTTP status codes."""
-    if e.response.status_code == 401:
-        raise HTTPException(status_code=401, detail="Unauthorized - Invalid GitHub token")
-    elif e.response.status_code == 403:
-        # Check for rate limiting
-        if "X-RateLimit-Remaining" in e.response.headers and e.response.headers["X-RateLimit-Remaining"] == "0":
-            retry_after = e.response.headers.get("X-RateLimit-Reset", str(int(time.time()) + 60))
-            raise HTTPException(
-                status_code=429, 
-                detail="Rate limit exceeded",
-                headers={"Retry-After": retry_after}
-            )
-        raise HTTPException(status_code=403, detail="Forbidden")
-    elif e.response.status_code == 404:
-        raise HTTPException(status_code=404, detail="Not found")
-    elif e.response.status_code >= 500:
-        raise HTTPException(status_code=503, detail="Upstream failure")
-    else:
-        raise HTTPException(status_code=400, detail="Bad request")
-
-def _build_cache_key(endpoint: str, *args) -> str:
-    """Build a cache key from endpoint and parameters."""
-    # Create a hash of all parameters to ensure uniqueness
-    param_str = "_".join(str(arg) if arg is not None else "None" for arg in args)
-    param_hash = hashlib.md5(param_str.encode()).hexdigest()[:8]
-    return f"{endpoint}_{param_hash}"
+    await _handle_github_response(e.response)
 
 def _normalize_issue_response(issue_data: dict) -> dict:
     """Normalize GitHub issue response by converting labels from objects to list of names."""
-    # Convert labels from objects to list of names
-    if "labels" in issue_data and issue_data["labels"]:
-        issue_data["labels"] = [label.get("name", "") for label in issue_data["labels"] if isinstance(label, dict)]
-    else:
-        issue_data["labels"] = []
+    # Convert labels from objects to list of names (GitHub label objects always carry "name")
+    issue_data["labels"] = [label["name"] for label in issue_data.get("labels") or ()]
     
     return issue_data
\ No newline at end of file
@@ -2,12 +2,18 @@
 
 import hmac
 import hashlib
-import json
 import logging
-from datetime import datetime
-from typing import Dict, List
-from fastapi import APIRouter, Request, HTTPException, status
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import lru_cache
+from itertools import islice
+from typing import Deque, Dict, Optional
+from fastapi import APIRouter, Query, Request, HTTPException, status
 from fastapi.responses import Response
+from starlette.background import BackgroundTask
+import orjson
 
 from src import config
 
@@ -17,42 +23,106 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# In-memory store for webhook events (in production, use a database)
-webhook_events: List[Dict] = []
+@dataclass(slots=True)
+class WebhookEventRecord:
+    """A processed webhook delivery as kept in the in-memory event store."""
+    id: str
+    event: str
+    action: Optional[str]
+    issue_number: Optional[int]
+    ts_ns: int
+
+# Bounded in-memory store for webhook events (in production, use a database);
+# the oldest events are dropped once MAX_STORED_EVENTS is reached
+MAX_STORED_EVENTS = 1000
+webhook_events: Deque[WebhookEventRecord] = deque(maxlen=MAX_STORED_EVENTS)
 ## Authored by  Parth Maradia
 @router.post("/webhook", status_code=status.HTTP_204_NO_CONTENT)
 async def receive_webhook(request: Request):
     """Receive and validate GitHub webhooks with HMAC signature verification."""
-    # Get the raw body
-    body = await request.body()
-    
     # Get the signature from headers
     signature = request.headers.get("X-Hub-Signature-256")
     if not signature:
         raise HTTPException(status_code=401, detail="Missing signature")
     
-    # Verify HMAC signature
-    if not _verify_signature(body, signature):
+    provided_signature = _parse_signature(signature)
+    if provided_signature is None:
+        raise HTTPException(status_code=401, detail="Invalid signature")
+    
+    # Stream the raw body into the HMAC, refusing bodies over the size cap
+    mac = _hmac_template().copy()
+    body = await _read_body(request, mac)
+    
+    # Compare raw digests using hmac.compare_digest to prevent timing attacks
+    if not hmac.compare_digest(provided_signature, mac.digest()):
         raise HTTPException(status_code=401, detail="Invalid signature")
     
-    # Get event type
     event_type = request.headers.get("X-GitHub-Event")
+    payload = _parse_delivery(event_type, body)
+    record = _dispatch_delivery(event_type, payload)
+    if record is None:
+        return Response(status_code=204)
+    
+    # Runs in the request's own task after the body is sent, so no extra Task per delivery
+    return Response(status_code=204, background=BackgroundTask(_record_event, record))
+
+## Authored by  Parth Maradia
+@router.get("/events")
+async def get_webhook_events(limit: int = Query(50, ge=0)):
+    """Get the last N processed webhook events for debugging purposes."""
+    # Walk back from the newest event, then restore chronological order
+    recent_events = list(islice(reversed(webhook_events), limit))
+    
+    # Format response
+    return [
+        {
+            "id": event.id,
+            "event": event.event,
+            "action": event.action,
+            "issue_number": event.issue_number,
+            "timestamp": datetime.fromtimestamp(event.ts_ns / 1e9, tz=timezone.utc).isoformat()
+        }
+        for event in reversed(recent_events)
+    ]
+
+async def _read_body(request: Request, mac: Optional[hmac.HMAC] = None) -> bytes:
+    """Read the request body chunk by chunk up to the size cap, feeding each chunk into mac if given."""
+    chunks = []
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > config.MAX_WEBHOOK_BODY_BYTES:
+            raise HTTPException(status_code=413, detail="Payload too large")
+        if mac is not None:
+            mac.update(chunk)
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+def _parse_delivery(event_type: Optional[str], body: bytes) -> Dict:
+    """Check the event type and parse a verified delivery body, raising HTTPException if either is invalid."""
+    # Get event type
     if not event_type:
         raise HTTPException(status_code=400, detail="Missing event type")
     
     # Parse the payload
     try:
-        payload = json.loads(body.decode('utf-8'))
-    except json.JSONDecodeError:
+        payload = orjson.loads(body)
+    except orjson.JSONDecodeError:
         raise HTTPException(status_code=400, detail="Invalid JSON payload")
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=400, detail="Invalid JSON payload")
+    
+    if event_type != "ping" and event_type not in ["issues", "issue_comment"]:
+        raise HTTPException(status_code=400, detail=f"Unsupported event type: {event_type}")
     
+    return payload
+
+def _dispatch_delivery(event_type: str, payload: Dict) -> Optional[WebhookEventRecord]:
+    """Handle a parsed delivery, returning the record to store for issue events."""
     # Handle different event types
     if event_type == "ping":
         logger.info("Received ping event")
-        return Response(status_code=204)
-    
-    if event_type not in ["issues", "issue_comment"]:
-        raise HTTPException(status_code=400, detail=f"Unsupported event type: {event_type}")
+        return None
     
     # Extract event details
     action = payload.get("action")
@@ -63,61 +133,29 @@ async def receive_webhook(request: Request):
     elif event_type == "issue_comment" and "issue" in payload:
         issue_number = payload["issue"].get("number")
     
-    # Store the event
-    event_id = f"{event_type}_{action}_{datetime.now().timestamp()}"
-    webhook_event = {
-        "id": event_id,
-        "event": event_type,
-        "action": action,
-        "issue_number": issue_number,
-        "timestamp": datetime.now().isoformat(),
-        "payload": payload  # Store full payload for debugging
-    }
-    
-    webhook_events.append(webhook_event)
-    
-    # Log the event
-    logger.info(f"Processed webhook: {event_type}.{action} for issue #{issue_number}")
-    
-    return Response(status_code=204)
-## Authored by  Parth Maradia
-@router.get("/events")
-async def get_webhook_events(limit: int = 50):
-    """Get the last N processed webhook events for debugging purposes."""
-    # Return the most recent events
-    recent_events = webhook_events[-limit:] if len(webhook_events) > limit else webhook_events
-    
-    # Format response
-    formatted_events = []
-    for event in recent_events:
-        formatted_events.append({
-            "id": event["id"],
-            "event": event["event"],
-            "action": event["action"],
-            "issue_number": event["issue_number"],
-            "timestamp": event["timestamp"]
-        })
-    
-    return formatted_events
+    now_ns = time.time_ns()
+    return WebhookEventRecord(f"{event_type}_{action}_{now_ns}", event_type, action, issue_number, now_ns)
 
-def _verify_signature(body: bytes, signature: str) -> bool:
-    """Verify the HMAC SHA-256 signature of the webhook payload using the webhook secret."""
-    if not signature.startswith("sha256="):
-        return False
-    
-    # Remove the "sha256=" prefix
-    signature = signature[7:]
+async def _record_event(record: WebhookEventRecord):
+    """Append a processed delivery to the event store and log it."""
+    webhook_events.append(record)
     
-    # Validate config and get webhook secret
-    from src.config import _validate_config
-    _validate_config()
-    
-    # Create the expected signature
-    expected_signature = hmac.new(
-        config.WEBHOOK_SECRET.encode('utf-8'),
-        body,
-        hashlib.sha256
-    ).hexdigest()
+    # Log the event (formatting is deferred until the record is emitted)
+    logger.info("Processed webhook: %s.%s for issue #%s", record.event, record.action, record.issue_number)
+
+def _parse_signature(signature: str) -> Optional[bytes]:
+    """Decode an X-Hub-Signature-256 header into the raw digest bytes, or None if it is malformed."""
+    # Expect exactly "sha256=" followed by 64 hex characters
+    if len(signature) != 71 or signature[:7] != "sha256=":
+        return None
     
-    # Compare signatures using hmac.compare_digest to prevent timing attacks
-    return hmac.compare_digest(signature, expected_signature)
+    # Decode the hex digest after the "sha256=" prefix
+    try:
+        return bytes.fromhex(signature[7:])
+    except ValueError:
+        return None
+
+@lru_cache(maxsize=1)
+def _hmac_template() -> hmac.HMAC:
+    """Build the HMAC SHA-256 object keyed with the webhook secret once; callers copy it per delivery."""
+    return hmac.new(config.WEBHOOK_SECRET_BYTES, None, hashlib.sha256)
@@ -0,0 +1,50 @@
+from typing import Iterable, Mapping, Tuple, Union
+
+Headers = Union[Mapping[str, str], Iterable[Tuple[str, str]]]
+
+async def call_app(method: str, path: str, body: bytes = b"", headers: Headers = ()) -> Tuple[int, bytes]:
+    """Call the ASGI app directly with a hand-built scope and return (status, body)."""
+    from src.main import app
+
+    if isinstance(headers, Mapping):
+        headers = headers.items()
+    raw_headers = [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers]
+    if body and not any(name == b"content-length" for name, _ in raw_headers):
+        raw_headers.append((b"content-length", str(len(body)).encode("ascii")))
+    path, _, query = path.partition("?")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode("ascii"),
+        "query_string": query.encode("ascii"),
+        "root_path": "",
+        "headers": raw_headers,
+        "client": ("testclient", 50000),
+        "server": ("testserver", 80),
+    }
+
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if request_sent:
+            return {"type": "http.disconnect"}
+        request_sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    status = 0
+    chunks = []
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return status, b"".join(chunks)
@@ -0,0 +1,11 @@
+import hmac
+from typing import List, Sequence
+
+def _sign(key: bytes, body: bytes) -> str:
+    """Create the X-Hub-Signature-256 value for one body."""
+    return "sha256=" + hmac.digest(key, body, 'sha256').hex()
+
+def batch_sigs(bodies: Sequence[bytes], key: bytes) -> List[str]:
+    """Sign many webhook bodies at once."""
+    # A plain loop: hashlib only releases the GIL for inputs of 2 KiB or more, so threads never pay off here
+    return [_sign(key, body) for body in bodies]
@@ -3,7 +3,17 @@
 import sys
 import os
 
-# Set environment variables before any imports
+import pytest
+import pytest_asyncio
+from fastapi.testclient import TestClient
+from httpx import ASGITransport, AsyncClient
+
+try:
+    import uvloop
+except ImportError:  # uvloop does not support Windows
+    uvloop = None
+
+# Set environment variables before anything imports src
 env_vars = {
     "GITHUB_TOKEN": "test_token",
     "GITHUB_OWNER": "test_owner",
@@ -16,3 +26,28 @@ for key, value in env_vars.items():
     os.environ[key] = value
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+# Editor and merge backups of test modules are never collected
+collect_ignore_glob = ["*.bak"]
+
+if uvloop is not None and sys.platform != "win32":
+    def pytest_asyncio_loop_factories(config, item):
+        """Run async tests and fixtures on uvloop, matching the production server loop."""
+        return {"uvloop": uvloop.new_event_loop}
+
+@pytest.fixture(scope="session")
+def client():
+    """Session-wide TestClient with app startup run once and primed by a warm-up request."""
+    from src.main import app
+
+    with TestClient(app) as c:
+        c.get("/")
+        yield c
+
+@pytest_asyncio.fixture(scope="session")
+async def async_client():
+    """Session-wide async client that drives the ASGI app in-process, without TestClient's thread portal."""
+    from src.main import app
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://testserver") as client:
+        yield client
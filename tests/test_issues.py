@@ -1,12 +1,10 @@
 ''' Authored by Parth Maradia '''
 import time
-from fastapi.testclient import TestClient
-from src.main import app
+import pytest
 from src import config
+from src.routes import issues
 
-client = TestClient(app)
-
-def test_create_issue_happy_path(httpx_mock):
+def test_create_issue_happy_path(client, httpx_mock):
     """Test successful issue creation with proper response and Location header."""
     gh_resp = {
         "number": 123, "html_url": "https://github.com/x/y/issues/123",
@@ -18,6 +16,8 @@ def test_create_issue_happy_path(httpx_mock):
         url=f"https://api.github.com/repos/{config.GITHUB_OWNER}/{config.GITHUB_REPO}/issues",
         status_code=201,
         json=gh_resp,
+        match_json={"title": "t", "body": "b", "labels": ["bug"]},
+        match_headers={"Content-Type": "application/json"},
     )
     r = client.post("/issues", json={"title": "t", "body": "b", "labels": ["bug"]})
     assert r.status_code == 201
@@ -25,12 +25,12 @@ def test_create_issue_happy_path(httpx_mock):
     data = r.json()
     assert data["labels"] == ["bug"]
 
-def test_create_issue_missing_title():
+def test_create_issue_missing_title(client):
     """Test issue creation fails when title is missing (validation error)."""
     r = client.post("/issues", json={"body": "no title"})
     assert r.status_code == 422 or r.status_code == 400  # Pydantic validation -> 422 in FastAPI
 
-def test_rate_limited_on_create(httpx_mock, monkeypatch):
+def test_rate_limited_on_create(client, httpx_mock, monkeypatch):
     """Test that rate limiting is properly handled with Retry-After header."""
     reset = str(int(time.time()) + 42)
     httpx_mock.add_response(
@@ -44,7 +44,7 @@ def test_rate_limited_on_create(httpx_mock, monkeypatch):
     assert r.status_code == 429
     assert "Retry-After" in r.headers
 
-def test_patch_close_issue(httpx_mock):
+def test_patch_close_issue(client, httpx_mock):
     """Test that an issue can be closed via PATCH request."""
     gh_resp = {
         "number": 123, "html_url": "https://github.com/x/y/issues/123",
@@ -61,7 +61,7 @@ def test_patch_close_issue(httpx_mock):
     assert r.status_code == 200
     assert r.json()["state"] == "closed"
 
-def test_patch_issue_not_found(httpx_mock):
+def test_patch_issue_not_found(client, httpx_mock):
     """Test that PATCH request returns 404 for non-existent issues."""
     httpx_mock.add_response(
         method="PATCH",
@@ -72,12 +72,12 @@ def test_patch_issue_not_found(httpx_mock):
     r = client.patch("/issues/999", json={"title": "x"})
     assert r.status_code == 404
 
-def test_patch_empty_body():
+def test_patch_empty_body(client):
     """Test that PATCH request with empty body returns 400 error."""
     r = client.patch("/issues/123", json={})
     assert r.status_code == 400
 
-def test_get_issues(httpx_mock):
+def test_get_issues(client, httpx_mock):
     """Test that GET /issues returns a list of issues with normalized labels."""
     gh_resp = [
         {
@@ -101,7 +101,7 @@ def test_get_issues(httpx_mock):
     assert data[0]["labels"] == ["bug"]
     assert r.headers.get("ETag") == '"abc123"'
 
-def test_get_issue_by_number(httpx_mock):
+def test_get_issue_by_number(client, httpx_mock):
     """Test that GET /issues/{number} returns a specific issue with normalized labels."""
     gh_resp = {
         "number": 123, "html_url": "https://github.com/x/y/issues/123",
@@ -122,7 +122,7 @@ def test_get_issue_by_number(httpx_mock):
     assert data["labels"] == ["enhancement"]
     assert r.headers.get("ETag") == '"def456"'
 
-def test_create_comment(httpx_mock):
+def test_create_comment(client, httpx_mock):
     """Test that a comment can be added to an issue successfully."""
     gh_resp = {
         "id": 456, "body": "Test comment", "user": {"login": "testuser"},
@@ -140,7 +140,7 @@ def test_create_comment(httpx_mock):
     assert data["id"] == 456
     assert data["body"] == "Test comment"
 
-def test_conditional_get_issues_304(httpx_mock):
+def test_conditional_get_issues_304(client, httpx_mock):
     """Test that GET /issues returns 304 Not Modified when If-None-Match matches cached ETag."""
     # First request - cache the ETag
     gh_resp = [
@@ -167,7 +167,7 @@ def test_conditional_get_issues_304(httpx_mock):
     r2 = client.get("/issues", headers={"If-None-Match": '"abc123"'})
     assert r2.status_code == 304
 
-def test_conditional_get_issue_304(httpx_mock):
+def test_conditional_get_issue_304(client, httpx_mock):
     """Test that GET /issues/{number} returns 304 Not Modified when If-None-Match matches cached ETag."""
     # First request - cache the ETag
     gh_resp = {
@@ -192,7 +192,7 @@ def test_conditional_get_issue_304(httpx_mock):
     r2 = client.get("/issues/123", headers={"If-None-Match": '"def456"'})
     assert r2.status_code == 304
 
-def test_conditional_get_issues_different_etag(httpx_mock):
+def test_conditional_get_issues_different_etag(client, httpx_mock):
     """Test that GET /issues makes GitHub API call when If-None-Match doesn't match cached ETag."""
     # First request - cache the ETag
     gh_resp1 = [
@@ -236,3 +236,45 @@ def test_conditional_get_issues_different_etag(httpx_mock):
     assert r2.headers.get("ETag") == '"xyz789"'
     data = r2.json()
     assert data[0]["title"] == "Updated Issue 1"
+
+def test_conditional_get_issue_forwards_etag(client, httpx_mock):
+    """Test that an uncached If-None-Match is forwarded to GitHub and its 304 is passed through."""
+    httpx_mock.add_response(
+        method="GET",
+        url=f"https://api.github.com/repos/{config.GITHUB_OWNER}/{config.GITHUB_REPO}/issues/777",
+        status_code=304,
+        headers={"ETag": '"upstream777"'},
+        match_headers={"If-None-Match": '"upstream777"'},
+    )
+
+    r = client.get("/issues/777", headers={"If-None-Match": '"upstream777"'})
+    assert r.status_code == 304
+    assert r.content == b""
+    assert r.headers.get("ETag") == '"upstream777"'
+    assert issues.etag_cache[("issue", 777)] == '"upstream777"'
+
+@pytest.mark.parametrize("if_none_match", ['"old", "e778"', "*"])
+def test_conditional_get_issue_caches_upstream_etag(client, httpx_mock, if_none_match):
+    """Test that an upstream 304 caches GitHub's ETag rather than the client's If-None-Match value."""
+    url = f"https://api.github.com/repos/{config.GITHUB_OWNER}/{config.GITHUB_REPO}/issues/778"
+    httpx_mock.add_response(method="GET", url=url, status_code=304, headers={"ETag": '"e778"'})
+    httpx_mock.add_response(method="GET", url=url, status_code=304, headers={"ETag": '"e778"'})
+
+    r = client.get("/issues/778", headers={"If-None-Match": if_none_match})
+    assert r.status_code == 304
+    assert r.headers.get("ETag") == '"e778"'
+    assert issues.etag_cache[("issue", 778)] == '"e778"'
+
+    # The same raw header is not answered locally, so it still reaches GitHub
+    assert client.get("/issues/778", headers={"If-None-Match": if_none_match}).status_code == 304
+    assert len(httpx_mock.get_requests()) == 2
+
+def test_get_issue_upstream_failure(client, httpx_mock):
+    """Test that GitHub 5xx responses are mapped to 503."""
+    httpx_mock.add_response(
+        method="GET",
+        url=f"https://api.github.com/repos/{config.GITHUB_OWNER}/{config.GITHUB_REPO}/issues/500",
+        status_code=502,
+    )
+    r = client.get("/issues/500")
+    assert r.status_code == 503
@@ -1,13 +1,29 @@
 ''' Authored by Joshini M Naagraj '''
+import orjson
+import pytest
 from fastapi.testclient import TestClient
 from src.main import app  # adjust import if your FastAPI app is elsewhere
-
-client = TestClient(app)
+from src import config
+from tests._asgi import call_app
 
 ## Authored by Akshata Madavi
-def test_read_root():
+async def test_read_root():
     """Test that the root endpoint returns the expected welcome message."""
-    response = client.get("/")
-    assert response.status_code == 200
-    assert response.json() == {"Hello": "World"}  # adapt to your actual response
+    status, body = await call_app("GET", "/")
+    assert status == 200
+    assert orjson.loads(body) == {"Hello": "World"}  # adapt to your actual response
+
+
+async def test_health_endpoints():
+    """Test that both health endpoints report ok."""
+    for path in ("/health", "/healthz"):
+        status, body = await call_app("GET", path)
+        assert status == 200
+        assert orjson.loads(body) == {"status": "ok"}
 
+def test_startup_requires_github_token(monkeypatch):
+    """Test that missing configuration fails once at startup rather than per request."""
+    monkeypatch.setattr(config, "GITHUB_TOKEN", None)
+    with pytest.raises(ValueError, match="GITHUB_TOKEN"):
+        with TestClient(app):
+            pass
@@ -0,0 +1,57 @@
+# tests/test_webhook_stress.py
+# Opt-in: run with WEBHOOK_STRESS=1 (and optionally WEBHOOK_STRESS_COUNT=N, WEBHOOK_STRESS_BATCH=N, WEBHOOK_STRESS_URL=http://host:port)
+import asyncio
+import os
+import httpx
+import orjson
+import pytest
+import pytest_asyncio
+from src import config
+from tests._sigbatch import batch_sigs
+
+pytestmark = pytest.mark.skipif(not os.getenv("WEBHOOK_STRESS"), reason="set WEBHOOK_STRESS=1 to run stress tests")
+
+STRESS_COUNT = int(os.getenv("WEBHOOK_STRESS_COUNT", "500"))
+SECRET_BYTES = config.WEBHOOK_SECRET_BYTES
+STRESS_URL = os.getenv("WEBHOOK_STRESS_URL")
+# Deliveries in flight at once in the client-side batch test; matches the keep-alive pool size
+STRESS_BATCH = int(os.getenv("WEBHOOK_STRESS_BATCH", "32"))
+
+@pytest_asyncio.fixture(scope="module")
+async def async_client(async_client):
+    """Reuse the in-process client, or a keep-alive pool against a running server when WEBHOOK_STRESS_URL is set."""
+    if not STRESS_URL:
+        yield async_client
+        return
+    transport = httpx.AsyncHTTPTransport(retries=0, limits=httpx.Limits(max_keepalive_connections=32))
+    async with httpx.AsyncClient(transport=transport, base_url=STRESS_URL) as client:
+        yield client
+
+def _post_delivery(client: httpx.AsyncClient, body: bytes, signature: str):
+    """Send one signed issues delivery to /webhook."""
+    return client.post("/webhook", content=body, headers={"X-Hub-Signature-256": signature, "X-GitHub-Event": "issues"})
+
+async def test_webhook_stress_many_deliveries(async_client):
+    """Test that many distinct signed deliveries sent concurrently are all accepted."""
+    bodies = [
+        orjson.dumps({"action": "opened", "issue": {"number": n, "title": f"Stress {n}"}})
+        for n in range(STRESS_COUNT)
+    ]
+    signatures = batch_sigs(bodies, SECRET_BYTES)
+
+    responses = await asyncio.gather(*(
+        _post_delivery(async_client, body, signature) for body, signature in zip(bodies, signatures)
+    ))
+    assert [r.status_code for r in responses] == [204] * STRESS_COUNT
+
+async def test_webhook_stress_client_side_batches(async_client):
+    """Test that deliveries sent in fixed-size concurrent batches, one batch after another, are all accepted."""
+    bodies = [orjson.dumps({"action": "edited", "issue": {"number": n}}) for n in range(STRESS_COUNT)]
+    signatures = batch_sigs(bodies, SECRET_BYTES)
+
+    statuses = []
+    for start in range(0, STRESS_COUNT, STRESS_BATCH):
+        batch = zip(bodies[start:start + STRESS_BATCH], signatures[start:start + STRESS_BATCH])
+        responses = await asyncio.gather(*(_post_delivery(async_client, body, signature) for body, signature in batch))
+        statuses.extend(r.status_code for r in responses)
+    assert statuses == [204] * STRESS_COUNT
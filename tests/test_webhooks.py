@@ -1,146 +1,135 @@
 ''' Authored by Sankalp Wahane'''
 # tests/test_webhooks.py
-import json
-import hmac
 import hashlib
-from fastapi.testclient import TestClient
-from src.main import app
+import hmac
+import json
+from collections import deque
+from typing import Dict, Optional
+import orjson
+import pytest
 from src import config
+from src.routes import webhooks
+from tests._asgi import call_app
 
-client = TestClient(app)
+SECRET_BYTES = config.WEBHOOK_SECRET_BYTES
 
-def _create_signature(body: bytes, secret: str) -> str:
+def _create_signature(body: bytes, secret: bytes = SECRET_BYTES) -> str:
     """Create HMAC SHA-256 signature for webhook payload testing."""
-    signature = hmac.new(
-        secret.encode('utf-8'),
-        body,
-        hashlib.sha256
-    ).hexdigest()
-    return f"sha256={signature}"
-
-def test_webhook_ping():
-    """Test that webhook ping events are handled correctly."""
-    payload = {"zen": "Keep it logically awesome."}
-    body = json.dumps(payload).encode('utf-8')
-    signature = _create_signature(body, config.WEBHOOK_SECRET)
-    
-    response = client.post(
-        "/webhook",
-        content=body,
-        headers={
-            "X-Hub-Signature-256": signature,
-            "X-GitHub-Event": "ping",
-            "Content-Type": "application/json"
-        }
-    )
-    assert response.status_code == 204
+    return "sha256=" + hmac.new(secret, body, hashlib.sha256).hexdigest()
 
-def test_webhook_issues_opened():
-    """Test that issue opened webhook events are processed correctly."""
-    payload = {
-        "action": "opened",
-        "issue": {
-            "number": 123,
-            "title": "Test Issue",
-            "body": "Test body"
-        }
-    }
-    body = json.dumps(payload).encode('utf-8')
-    signature = _create_signature(body, config.WEBHOOK_SECRET)
-    
-    response = client.post(
-        "/webhook",
-        content=body,
-        headers={
-            "X-Hub-Signature-256": signature,
-            "X-GitHub-Event": "issues",
-            "Content-Type": "application/json"
-        }
-    )
-    assert response.status_code == 204
+def _webhook_headers(event: str, body: Optional[bytes] = None) -> Dict[str, str]:
+    """Build delivery headers for an event, signed over body when one is given."""
+    headers = {"X-GitHub-Event": event, "Content-Type": "application/json"}
+    if body is not None:
+        headers["X-Hub-Signature-256"] = _create_signature(body)
+    return headers
 
-def test_webhook_issue_comment():
-    """Test that issue comment webhook events are processed correctly."""
-    payload = {
-        "action": "created",
-        "issue": {
-            "number": 123
-        },
-        "comment": {
-            "id": 456,
-            "body": "Test comment"
-        }
-    }
-    body = json.dumps(payload).encode('utf-8')
-    signature = _create_signature(body, config.WEBHOOK_SECRET)
-    
-    response = client.post(
-        "/webhook",
-        content=body,
-        headers={
-            "X-Hub-Signature-256": signature,
-            "X-GitHub-Event": "issue_comment",
-            "Content-Type": "application/json"
-        }
-    )
-    assert response.status_code == 204
+# Payloads are the exact bytes a delivery carries, kept as literals and signed once at import
+PING_BODY = b'{"zen":"Keep it logically awesome."}'
+ISSUES_BODY = b'{"action":"opened","issue":{"number":123,"title":"Test Issue","body":"Test body"}}'
+COMMENT_BODY = b'{"action":"created","issue":{"number":123},"comment":{"id":456,"body":"Test comment"}}'
+CLOSED_BODY = b'{"action":"closed","issue":{"number":42}}'
+BAD_BODY = b'{"test":"data"}'
+HEADERS_PING = _webhook_headers("ping", PING_BODY)
+HEADERS_ISSUES = _webhook_headers("issues", ISSUES_BODY)
+HEADERS_COMMENT = _webhook_headers("issue_comment", COMMENT_BODY)
+HEADERS_CLOSED = _webhook_headers("issues", CLOSED_BODY)
+HEADERS_UNSUPPORTED = _webhook_headers("push", BAD_BODY)
 
-def test_webhook_invalid_signature():
-    """Test that webhooks with invalid signatures are rejected."""
-    payload = {"test": "data"}
-    body = json.dumps(payload).encode('utf-8')
-    
-    response = client.post(
-        "/webhook",
-        content=body,
-        headers={
-            "X-Hub-Signature-256": "sha256=invalid",
-            "X-GitHub-Event": "issues",
-            "Content-Type": "application/json"
-        }
-    )
-    assert response.status_code == 401
-
-def test_webhook_missing_signature():
-    """Test that webhooks without signatures are rejected."""
-    payload = {"test": "data"}
-    body = json.dumps(payload).encode('utf-8')
-    
-    response = client.post(
-        "/webhook",
-        content=body,
-        headers={
-            "X-GitHub-Event": "issues",
-            "Content-Type": "application/json"
-        }
-    )
-    assert response.status_code == 401
-
-def test_webhook_unsupported_event():
-    """Test that webhooks with unsupported event types are rejected."""
-    payload = {"test": "data"}
-    body = json.dumps(payload).encode('utf-8')
-    signature = _create_signature(body, config.WEBHOOK_SECRET)
-    
-    response = client.post(
-        "/webhook",
-        content=body,
-        headers={
-            "X-Hub-Signature-256": signature,
-            "X-GitHub-Event": "push",
-            "Content-Type": "application/json"
-        }
-    )
-    assert response.status_code == 400
+@pytest.mark.parametrize("body,expected", [
+    (PING_BODY, {"zen": "Keep it logically awesome."}),
+    (ISSUES_BODY, {"action": "opened", "issue": {"number": 123, "title": "Test Issue", "body": "Test body"}}),
+    (COMMENT_BODY, {"action": "created", "issue": {"number": 123}, "comment": {"id": 456, "body": "Test comment"}}),
+    (CLOSED_BODY, {"action": "closed", "issue": {"number": 42}}),
+    (BAD_BODY, {"test": "data"}),
+])
+def test_payload_literals_decode(body, expected):
+    """Test that the byte-literal payloads still decode to the payloads they stand for."""
+    assert json.loads(body) == expected
+
+@pytest.mark.parametrize("body,headers", [
+    pytest.param(PING_BODY, HEADERS_PING, id="ping"),
+    pytest.param(ISSUES_BODY, HEADERS_ISSUES, id="issues_opened"),
+    pytest.param(COMMENT_BODY, HEADERS_COMMENT, id="issue_comment"),
+])
+async def test_webhook_ok(body, headers):
+    """Test that ping, issue opened and issue comment webhook events are accepted."""
+    assert (await call_app("POST", "/webhook", body, headers))[0] == 204
 
-def test_get_webhook_events():
+@pytest.mark.parametrize("headers,status", [
+    pytest.param({**_webhook_headers("issues"), "X-Hub-Signature-256": "sha256=invalid"}, 401, id="invalid_signature"),
+    pytest.param(
+        {**_webhook_headers("issues"), "X-Hub-Signature-256": "sha256=" + hmac.digest(b"other_secret", BAD_BODY, 'sha256').hex()},
+        401,
+        id="wrong_digest",
+    ),
+    pytest.param({**_webhook_headers("issues"), "X-Hub-Signature-256": "sha256=" + "z" * 64}, 401, id="not_hex"),
+    pytest.param(_webhook_headers("issues"), 401, id="missing_signature"),
+    pytest.param(HEADERS_UNSUPPORTED, 400, id="unsupported_event"),
+])
+async def test_webhook_rejected(headers, status):
+    """Test that deliveries with a bad or missing signature, or an unsupported event type, are rejected."""
+    assert (await call_app("POST", "/webhook", BAD_BODY, headers))[0] == status
+
+async def test_get_webhook_events():
     """Test that webhook events can be retrieved via GET /events endpoint."""
-    response = client.get("/events")
-    assert response.status_code == 200
-    assert isinstance(response.json(), list)
+    status, body = await call_app("GET", "/events")
+    assert status == 200
+    assert isinstance(orjson.loads(body), list)
 
-def test_get_webhook_events_with_limit():
+async def test_get_webhook_events_with_limit():
     """Test that webhook events can be retrieved with a limit parameter."""
-    response = client.get("/events?limit=10")
+    status, body = await call_app("GET", "/events?limit=10")
+    assert status == 200
+    assert isinstance(orjson.loads(body), list)
+
+async def test_get_webhook_events_returns_latest_in_order(monkeypatch):
+    """Test that /events returns the newest N events, oldest first."""
+    events = deque(
+        (webhooks.WebhookEventRecord(str(i), "issues", "opened", i, i * 10**9) for i in range(5)),
+        maxlen=webhooks.MAX_STORED_EVENTS,
+    )
+    monkeypatch.setattr(webhooks, "webhook_events", events)
+
+    status, body = await call_app("GET", "/events?limit=3")
+    assert status == 200
+    assert [event["id"] for event in orjson.loads(body)] == ["2", "3", "4"]
+    assert orjson.loads(body)[0]["timestamp"] == "1970-01-01T00:00:02+00:00"
+
+async def test_webhook_delivery_is_recorded(monkeypatch):
+    """Test that an accepted delivery shows up in /events as soon as the delivery is acknowledged."""
+    monkeypatch.setattr(webhooks, "webhook_events", deque(maxlen=webhooks.MAX_STORED_EVENTS))
+
+    assert (await call_app("POST", "/webhook", CLOSED_BODY, HEADERS_CLOSED))[0] == 204
+
+    events = orjson.loads((await call_app("GET", "/events"))[1])
+    assert [(e["event"], e["action"], e["issue_number"]) for e in events] == [("issues", "closed", 42)]
+
+async def test_webhook_delivery_skips_cors(async_client):
+    """Test that GitHub deliveries bypass CORS while the browser-facing /events keeps it."""
+    origin = {"Origin": "https://example.com"}
+    response = await async_client.post("/webhook", content=PING_BODY, headers={**HEADERS_PING, **origin})
+    assert response.status_code == 204
+    assert "access-control-allow-origin" not in response.headers
+
+    response = await async_client.get("/events", headers=origin)
     assert response.status_code == 200
-    assert isinstance(response.json(), list)
+    assert "access-control-allow-origin" in response.headers
+
+async def test_webhook_invalid_json():
+    """Test that a correctly signed but malformed JSON payload is rejected."""
+    body = b'{"action": '
+    assert (await call_app("POST", "/webhook", body, _webhook_headers("issues", body)))[0] == 400
+
+async def test_webhook_oversized_content_length(monkeypatch):
+    """Test that deliveries declaring a body over the current size cap are rejected before verification."""
+    monkeypatch.setattr(config, "MAX_WEBHOOK_BODY_BYTES", 8)
+    # Only the declared length is over the cap, so a 413 here can only come from the middleware
+    headers = {**_webhook_headers("issues", b""), "Content-Length": "9"}
+    assert (await call_app("POST", "/webhook", b"x", headers))[0] == 413
+
+async def test_webhook_oversized_streamed_body(monkeypatch):
+    """Test that the streamed body is capped even when an understated Content-Length passes the middleware."""
+    monkeypatch.setattr(config, "MAX_WEBHOOK_BODY_BYTES", 8)
+    headers = {**HEADERS_ISSUES, "Content-Length": "8"}
+    assert (await call_app("POST", "/webhook", ISSUES_BODY, headers))[0] == 413